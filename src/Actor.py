@@ -10,14 +10,134 @@
 
 # Standard library imports
 import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Optional
 
 # Third-party imports
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage, AIMessage
+from langchain.callbacks.base import BaseCallbackHandler
 
 # Local application/library-specific imports
-from prompt_templates import system_message_template, human_message_template, ai_message_template
+from prompt_templates import shared_system_template, persona_system_template, human_message_template, ai_message_template
+from prompt_cache import prefix_cache
+from token_counter import MESSAGE_OVERHEAD, count_message_tokens, count_tokens
+from tracer import tracer
+
+
+# words of an utterance, with the **Name**: label and each [emote] (or *emote*) as a single match that isn't counted
+_word_pattern = re.compile(r'\*\*[^*\n]+\*\*:?|\*[^*\n]+\*|\[[^\]\n]*\]|\S+')
+# the end of a sentence, including any closing quotes or brackets
+_sentence_end_pattern = re.compile(r'[.!?]["\')\]]*(?=\s|$)')
+
+
+def _trim_to_sentence(text: str, max_words: Optional[int] = None) -> str:
+    """
+    Trims text to at most max_words words (the name label and emotes excluded), ending on the last complete sentence that fits.
+
+    Args:
+        text (str): The text to trim.
+        max_words (Optional[int]): The word limit, or None to only drop an unfinished last sentence.
+
+    Returns:
+        str: The trimmed text. If no sentence ends within the limit, the words that fit.
+    """
+    cut: int = len(text)
+    if max_words:
+        words: int = 0
+        for match in _word_pattern.finditer(text):
+            if _is_word(match.group()):
+                words += 1
+                if words > max_words:
+                    cut = match.start()
+                    break
+
+    head: str = text[:cut].rstrip()
+    ends: list = list(_sentence_end_pattern.finditer(head))
+    return head[:ends[-1].end()] if ends else head
+
+
+def _ends_sentence(text: str) -> bool:
+    """
+    Checks whether text ends on a complete sentence (or an [emote] or *emote*), rather than being cut off mid-sentence.
+
+    Args:
+        text (str): The text to check.
+
+    Returns:
+        bool: True if the text ends cleanly.
+    """
+    text = text.rstrip()
+    return not text or text.endswith(('*', ']')) or bool(_sentence_end_pattern.search(text, max(len(text) - 3, 0)))
+
+
+@lru_cache(maxsize = 8)
+def _shared_system_content(behavior: Optional[str], company: Optional[str]) -> str:
+    """
+    Formats the system message content shared by every Actor in a Conversation.
+    It is cached, so all Actors hold, and send, the very same string.
+
+    Args:
+        behavior (Optional[str]): The Conversation's behavior instructions.
+        company (Optional[str]): The Conversation's company profile.
+
+    Returns:
+        str: The shared system message content.
+    """
+    return shared_system_template.format(behavior = behavior, company = company)
+
+
+class _FinishReasonHandler(BaseCallbackHandler):
+    """
+    Captures why the model stopped generating (e.g. 'stop' or 'length'), which invoke() and batch() don't return.
+    """
+
+    def __init__(self) -> None:
+        self.finish_reason: Optional[str] = None
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                if generation.generation_info and generation.generation_info.get('finish_reason'):
+                    self.finish_reason = generation.generation_info['finish_reason']
+
+
+def _finish_reason(response, handler: _FinishReasonHandler) -> Optional[str]:
+    """
+    Gets why the model stopped generating a response, from the response's metadata (newer langchain) or the callback.
+
+    Args:
+        response: The message returned by the chat model.
+        handler (_FinishReasonHandler): The callback handler passed with the call.
+
+    Returns:
+        Optional[str]: The finish reason, or None if the model doesn't report one.
+    """
+    metadata: dict = getattr(response, 'response_metadata', None) or {}
+    return metadata.get('finish_reason') or handler.finish_reason
+
+
+def _is_word(token: str) -> bool:
+    """
+    Checks whether a _word_pattern match counts as a word, i.e. isn't the name label or an emote.
+    """
+    return not token.startswith(('*', '['))
+
+
+def _count_words(text: str) -> int:
+    """
+    Counts the words of an utterance, excluding the **Name**: label and [emotes].
+
+    Args:
+        text (str): The text to count.
+
+    Returns:
+        int: The number of words.
+    """
+    return sum(1 for match in _word_pattern.finditer(text) if _is_word(match.group()))
 
 
 
@@ -35,6 +155,7 @@ class Actor:
 
     # Class variables
     __convo_bot: ChatOpenAI = None          # app-provided LLM instance to conduct conversations with the personified Actor.
+    __message_types: dict = {'human': HumanMessage, 'ai': AIMessage, 'system': SystemMessage}   # rebuilds spilled messages by type
 
 
     # Class variable setters
@@ -92,6 +213,7 @@ class Actor:
             role (str, optional): The corporate role of the actor. Defaults to 'Unknown'.
             persona (str, optional): The instructions for the actor. Defaults to "You are a helpful, corporate assistant.".
             temperature (float, optional): The temperature value for generating responses. Defaults to 0.9.
+            skillset (str, optional): A skillset to expand into the persona. Defaults to "".
             
         Returns:
             None
@@ -107,6 +229,26 @@ class Actor:
  
         # init the bot's conversation memory & give it it's instructions via a system message.
         self._message_history: list = []
+        self._pending: list = []                    # messages heard but not yet added to the history (see hear())
+        self._message_tokens: list = []             # token count of each message in the history, kept in step with it
+        self._token_total: int = 0                  # running sum of _message_tokens
+
+        # bounded-memory mode: once the history exceeds max_history, the oldest turns are spilled to disk
+        self._max_history: Optional[int] = None     # cap on in-memory messages, excluding the system messages. None = unbounded
+        self._spill_path: Optional[str] = None      # JSON Lines file receiving evicted messages
+        self._spilled_count: int = 0                # number of messages evicted to the spill file so far
+        self._pinned: int = 0                       # leading (system) messages that are never evicted
+        self._topic_message: Optional[HumanMessage] = None    # the current topic is kept in memory, too
+        self._topic_spilled: bool = False           # whether the current topic has also been written to the spill file
+
+        # output budget: real generation limits, plus sentence-boundary trimming of whatever still runs over
+        self._max_tokens: Optional[int] = None      # generation limit sent to the model. None = model default
+        self._max_words: Optional[int] = None       # word limit per utterance, emotes excluded. None = unlimited
+        self._stop: Optional[List[str]] = None      # stop sequences sent to the model
+        self._turns: int = 0                        # responses received
+        self._overruns: int = 0                     # responses that had to be trimmed
+        self._trimmed_words: int = 0                # words removed by trimming
+        self._mid_sentence_cuts: int = 0            # trimmed responses left ending mid-sentence, as no sentence ended within the budget
 
         self._behavior: str = None
         self._company: str = None
@@ -156,6 +298,9 @@ class Actor:
         Returns:
             str: The chatbot's response to the user message.
         """
+        # materialize whatever was heard since the last turn
+        self._flush_pending()
+
         if message:
             # append the user's message to the local conversation memory
             self._append_message('human', message)
@@ -164,21 +309,237 @@ class Actor:
         if not self.__convo_bot:
             raise Exception('No language model instance found! Please set the conversation bot using Actor.set_convo_bot() before invoking.')
 
-        # invoke the model
-        self.__convo_bot.temperature = self._temperature
-        response: str = self.__convo_bot.invoke(self._message_history)
+        # invoke the model. The temperature is passed per call, as the model may be shared by Actors talking in parallel
+        prefix_cache.record(self._message_history)
+        handler = _FinishReasonHandler()
+        with tracer.span('llm.invoke', actor = self._first_name, messages = len(self._message_history)):
+            response: str = self.__convo_bot.invoke(self._message_history, config = {'callbacks': [handler]}, **self._generation_kwargs())
+
+        return self._accept_response(response, _finish_reason(response, handler))
+
+
+    @classmethod
+    def batch_invoke(cls, actors: List['Actor']) -> List[str]:
+        """
+        Calls the cached chat model for several Actors at once, each responding to its current message history.
+        The requests are sent concurrently, so the batch costs roughly one model round-trip of wall time.
+
+        Args:
+            actors (List[Actor]): The Actors to invoke.
+
+        Returns:
+            List[str]: The Actors' responses, in the same order as the actors argument.
+        """
+        if not cls.__convo_bot:
+            raise Exception('No language model instance found! Please set the conversation bot using Actor.set_convo_bot() before invoking.')
+
+        if not actors:
+            return []
+
+        # generation settings apply to a whole batch, so Actors are batched per setting and the batches run side by side
+        groups: dict = {}
+        for index, actor in enumerate(actors):
+            settings: tuple = tuple((key, tuple(value) if isinstance(value, list) else value) for key, value in actor._generation_kwargs().items())
+            groups.setdefault(settings, []).append(index)
 
+        for actor in actors:
+            actor._flush_pending()
+            prefix_cache.record(actor._message_history)
+
+        handlers: list = [_FinishReasonHandler() for _ in actors]
+
+        def run_batch(settings: tuple, indices: List[int]) -> list:
+            histories: list = [actors[index]._message_history for index in indices]
+            configs: list = [{'callbacks': [handlers[index]], 'max_concurrency': len(histories)} for index in indices]
+            kwargs: dict = {key: list(value) if isinstance(value, tuple) else value for key, value in settings}
+            return cls.__convo_bot.batch(histories, config = configs, **kwargs)
+
+        responses: list = [None] * len(actors)
+        with tracer.span('llm.batch', actors = len(actors)), ThreadPoolExecutor(max_workers = len(groups)) as executor:
+            futures: dict = {executor.submit(run_batch, settings, indices): indices for settings, indices in groups.items()}
+            for future, indices in futures.items():
+                for index, response in zip(indices, future.result()):
+                    responses[index] = response
+
+        return [actor._accept_response(response, _finish_reason(response, handler)) for actor, response, handler in zip(actors, responses, handlers)]
+
+
+    def _accept_response(self, response, finish_reason: Optional[str] = None) -> str:
+        """
+        Helper method to record the model's response in the message history, unless the Actor passed.
+
+        Args:
+            response: The message returned by the chat model.
+            finish_reason (Optional[str]): Why the model stopped generating, if it reported it.
+
+        Returns:
+            str: The response content, or a pass notice.
+        """
         if response and (not ('*Pass*' in response.content)):
+            content: str = self._enforce_output_budget(response.content, finish_reason)
             # append the LLM's response to the local conversation memory
-            self._append_message('human', response.content)
-            return response.content
+            self._append_message('human', content)
+            return content
         else:
             return self.first_name + ': *Pass*'
 
 
+    def snapshot_prompt(self) -> tuple:
+        """
+        Gets a copy of the Actor's prompt as it stands, for drafting a response in the background.
+        Nothing is flushed, so whatever is heard before the Actor's turn is still coalesced with what it has heard already.
+
+        Returns:
+            tuple: A copy of the message history, and of the messages heard but not yet added to it.
+        """
+        return list(self._message_history), list(self._pending)
+
+
+    def draft(self, snapshot: tuple, heard: List[str]) -> dict:
+        """
+        Speculatively generates the Actor's response to a prompt snapshot plus messages it is expected to hear first.
+        Nothing about the Actor changes; the draft only counts once passed to commit_draft().
+
+        Args:
+            snapshot (tuple): A snapshot from snapshot_prompt().
+            heard (List[str]): The messages the Actor is expected to hear before its turn, in order.
+
+        Returns:
+            dict: The draft: the prompt it was generated from, the model's response and finish reason, and its processed 'text' (None if the Actor passed).
+        """
+        if not self.__convo_bot:
+            raise Exception('No language model instance found! Please set the conversation bot using Actor.set_convo_bot() before invoking.')
+
+        # mirror _flush_pending(), which coalesces everything heard since the Actor's last turn into a single human message
+        prompt, pending = snapshot
+        heard = pending + list(heard)
+        if heard:
+            prompt = prompt + [HumanMessage(content=human_message_template.format(content='\n\n'.join(heard)))]
+
+        prefix_cache.record(prompt)
+        handler = _FinishReasonHandler()
+        with tracer.span('llm.draft', actor = self._first_name, messages = len(prompt)):
+            response = self.__convo_bot.invoke(prompt, config = {'callbacks': [handler]}, **self._generation_kwargs())
+        finish_reason: Optional[str] = _finish_reason(response, handler)
+
+        text: Optional[str] = None
+        if response and (not ('*Pass*' in response.content)):
+            text, _ = self._fit_output_budget(response.content, finish_reason)
+
+        return {'prompt': prompt, 'response': response, 'finish_reason': finish_reason, 'text': text}
+
+
+    def commit_draft(self, draft: dict) -> Optional[str]:
+        """
+        Takes a draft from draft() as the Actor's turn, provided the Actor's prompt is still the one the draft was generated from.
+
+        Args:
+            draft (dict): The draft to commit.
+
+        Returns:
+            Optional[str]: The response, exactly as invoke() would have returned it, or None if the draft is stale.
+        """
+        self._flush_pending()
+
+        # the history only grows between a snapshot and the turn (spills aside), so it matches the draft's prompt exactly when it has the
+        # same length and ends in the same message, i.e. the Actor heard just what the draft assumed
+        prompt: list = draft['prompt']
+        if len(prompt) != len(self._message_history) or prompt[-1].content != self._message_history[-1].content:
+            return None
+
+        return self._accept_response(draft['response'], draft['finish_reason'])
+
+
+    def set_output_budget(self, max_tokens: Optional[int] = None, max_words: Optional[int] = None, stop: Optional[List[str]] = None) -> None:
+        """
+        Limits the length of the Actor's responses. max_tokens and stop are sent to the model as generation limits;
+        responses that still exceed max_words, or were cut off mid-sentence, are trimmed to a sentence boundary.
+
+        Args:
+            max_tokens (Optional[int]): The maximum number of tokens the model may generate per response.
+            max_words (Optional[int]): The maximum number of words per response, emotes excluded.
+            stop (Optional[List[str]]): Sequences at which the model stops generating.
+        """
+        if max_tokens is not None and max_tokens < 1:
+            raise ValueError("max_tokens must be a positive integer.")
+        if max_words is not None and max_words < 1:
+            raise ValueError("max_words must be a positive integer.")
+
+        self._max_tokens = max_tokens
+        self._max_words = max_words
+        self._stop = list(stop) if stop else None
+
+
+    def _generation_kwargs(self) -> dict:
+        """
+        Helper method to gather the per-call generation settings for the chat model.
+
+        Returns:
+            dict: The keyword arguments for the model's invoke() or batch().
+        """
+        kwargs: dict = {'temperature': self._temperature}
+        if self._max_tokens:
+            kwargs['max_tokens'] = self._max_tokens
+        if self._stop:
+            kwargs['stop'] = self._stop
+        return kwargs
+
+
+    def _enforce_output_budget(self, content: str, finish_reason: Optional[str] = None) -> str:
+        """
+        Helper method to trim a response that overran the output budget, and to measure the overrun.
+
+        Args:
+            content (str): The response content.
+            finish_reason (Optional[str]): Why the model stopped generating, if it reported it.
+
+        Returns:
+            str: The content, trimmed to a sentence boundary if it overran.
+        """
+        self._turns += 1
+
+        trimmed, overran = self._fit_output_budget(content, finish_reason)
+        if overran:
+            self._overruns += 1
+            self._trimmed_words += _count_words(content) - _count_words(trimmed)
+
+            # no sentence ended within the budget, so the words that fit were kept; mark the cut rather than pass it off as whole
+            if not _ends_sentence(trimmed):
+                self._mid_sentence_cuts += 1
+                trimmed += '...'
+
+        return trimmed
+
+
+    def _fit_output_budget(self, content: str, finish_reason: Optional[str] = None) -> tuple:
+        """
+        Helper method to trim a response to the output budget, without recording anything.
+
+        Args:
+            content (str): The response content.
+            finish_reason (Optional[str]): Why the model stopped generating, if it reported it.
+
+        Returns:
+            tuple: The content, trimmed to a sentence boundary if needed, and whether it overran
+                   (hit the token limit, or lost words to trimming).
+        """
+        # the model reports when max_tokens cut it off; without a finish reason, fall back to checking the last sentence ended
+        if finish_reason is not None:
+            cut_off: bool = finish_reason == 'length'
+        else:
+            cut_off = bool(self._max_tokens) and not _ends_sentence(content)
+
+        too_long: bool = bool(self._max_words) and _count_words(content) > self._max_words
+        if not (too_long or cut_off):
+            return content, False
+
+        trimmed: str = _trim_to_sentence(content, self._max_words)
+        return trimmed, finish_reason == 'length' or trimmed != content
+
+
     def create_system_message(self) -> None:
         """
-        Creates the system message based on the Actor's persona and appends it to the message history
+        Creates the system messages, shared instructions first and then the Actor's persona, and appends them to the message history
 
         Returns:
             None
@@ -188,7 +549,8 @@ class Actor:
     
     def hear(self, message: str) -> None:
         """
-        Simulates "hearing" a message from another Actor
+        Simulates "hearing" a message from another Actor.
+        Hearing is lazy: the message is only queued, and added to the history when the Actor next needs it, e.g. to speak.
         
         Args:
             message (str): The message content to be 'heard' by the Actor
@@ -196,31 +558,183 @@ class Actor:
         Returns:
             None
         """        
-        self._append_message('human', message)
+        self._pending.append(message)
+
+        # in bounded-memory mode, the queue is held to the same cap as the history
+        if self._max_history and len(self._pending) >= self._max_history:
+            self._flush_pending()
+
+
+    def _flush_pending(self) -> None:
+        """
+        Helper method to add the messages heard since the last flush to the history, coalesced into a single human message.
+        """
+        if not self._pending:
+            return
+
+        content: str = '\n\n'.join(self._pending)
+        with tracer.span('tokens.count'):
+            content_tokens: int = self.pending_token_count + count_tokens('\n\n') * (len(self._pending) - 1)
+        self._pending = []
+        self._append_message('human', content, content_tokens)
 
 
-    def _append_message(self, message_type: str, content: Optional[str] = '') -> None:
+    def _append_message(self, message_type: str, content: Optional[str] = '', content_tokens: Optional[int] = None) -> None:
         """
         Helper method to format and append messages to the message history.
 
         Args:
             message_type (str): The type of the message ('human', 'ai', or 'system').
             content (Optional[str]): The content of the message.
+            content_tokens (Optional[int]): The token count of a human message's content, if already known, so it isn't encoded again.
         """
-        if message_type == 'human':
-            formatted_message = human_message_template.format(content=content)
-            self._message_history.append(HumanMessage(content=formatted_message))
-        elif message_type == 'ai':
-            formatted_message = ai_message_template.format(response=content)
-            self._message_history.append(AIMessage(content=formatted_message))
-        elif message_type == 'system':
-            formatted_message = system_message_template.format(
-                behavior=self._behavior,
-                company=self._company,
-                persona=self._persona
-            )
-            self._message_history.append(SystemMessage(content=formatted_message))
-            
+        messages: list = []
+        with tracer.span('prompt.format', type = message_type):
+            if message_type == 'human':
+                formatted_message = human_message_template.format(content=content)
+                messages.append(HumanMessage(content=formatted_message))
+            elif message_type == 'ai':
+                formatted_message = ai_message_template.format(response=content)
+                messages.append(AIMessage(content=formatted_message))
+            elif message_type == 'system':
+                # shared, immutable instructions first and the persona second, keeping the prompt prefix identical across Actors
+                messages.append(SystemMessage(content=_shared_system_content(self._behavior, self._company)))
+                formatted_message = persona_system_template.format(persona=self._persona)
+                messages.append(SystemMessage(content=formatted_message))
+
+        # counted outside the formatting span, so token counting shows up as its own cost
+        tokens: Optional[int] = None
+        if content_tokens is not None and message_type == 'human':
+            with tracer.span('tokens.count'):
+                tokens = content_tokens + count_tokens(human_message_template.format(content='')) + MESSAGE_OVERHEAD
+
+        for message in messages:
+            self._push_message(message, tokens)
+        if message_type == 'system':
+            self._pinned = len(self._message_history)
+
+        self._enforce_history_cap()
+
+
+    def _push_message(self, message, tokens: Optional[int] = None) -> None:
+        """
+        Helper method to append a message to the history and update the running token count.
+
+        Args:
+            message: The langchain message to append.
+            tokens (Optional[int]): The message's token count, if already known. Counted here otherwise.
+        """
+        if tokens is None:
+            with tracer.span('tokens.count'):
+                tokens = count_message_tokens(message)
+        self._message_history.append(message)
+        self._message_tokens.append(tokens)
+        self._token_total += tokens
+
+
+    def set_history_cap(self, max_history: Optional[int], spill_path: Optional[str] = None) -> None:
+        """
+        Enables (or disables) bounded-memory mode for this Actor's message history.
+
+        Args:
+            max_history (Optional[int]): The maximum number of messages, excluding the system messages, kept in memory. None disables the cap.
+            spill_path (Optional[str]): The JSON Lines file that evicted messages are appended to. Required when max_history is set.
+                                        A file left at that path, e.g. by an earlier run, is emptied.
+        """
+        if max_history is not None:
+            if max_history < 1:
+                raise ValueError("max_history must be a positive integer.")
+            if not spill_path:
+                raise ValueError("A spill_path is required when capping the message history.")
+
+        # a new spill file starts empty, so export_history() only ever reads back this Actor's own turns
+        if spill_path and spill_path != self._spill_path:
+            open(spill_path, 'w').close()
+
+        self._max_history = max_history
+        self._spill_path = spill_path
+        self._enforce_history_cap()
+
+
+    def export_history(self) -> list:
+        """
+        Gets the Actor's complete message history, including any messages spilled to disk in bounded-memory mode.
+
+        Returns:
+            list: The spilled messages, oldest first, followed by the in-memory history.
+        """
+        self._flush_pending()
+
+        spilled: list = []
+        if self._spill_path and os.path.exists(self._spill_path):
+            with open(self._spill_path, 'r') as file:
+                for line in file:
+                    record: dict = json.loads(line)
+                    spilled.append(self.__message_types[record['type']](content=record['content']))
+
+        # the pinned system messages lead the export, just as they lead the live history
+        pinned: list = self._message_history[:self._pinned]
+        in_memory: list = [message for message in self._message_history[self._pinned:] if not (self._topic_spilled and message is self._topic_message)]
+        return pinned + spilled + in_memory
+
+
+    def _drop_message(self, message) -> None:
+        """
+        Helper method to remove a message from the in-memory history, along with its token count.
+
+        Args:
+            message: The message to remove, matched by identity.
+        """
+        for index, candidate in enumerate(self._message_history):
+            if candidate is message:
+                del self._message_history[index]
+                self._token_total -= self._message_tokens.pop(index)
+                return
+
+
+    def _enforce_history_cap(self) -> None:
+        """
+        Helper method to evict the oldest messages to the spill file once the history exceeds its cap.
+        The system messages and the current topic are never evicted.
+        """
+        if not self._max_history:
+            return
+
+        overflow: int = len(self._message_history) - self._pinned - self._max_history
+        if overflow <= 0:
+            return
+
+        # evict a quarter of the cap at once, so the prompt prefix stays stable (and cacheable) between evictions
+        overflow += self._max_history // 4
+
+        evicted: list = []
+        kept: list = []
+        kept_tokens: list = []
+        for message, tokens in zip(self._message_history[self._pinned:], self._message_tokens[self._pinned:]):
+            if message is self._topic_message:
+                # keep the topic in memory, but record it in the spill file so exports stay in order
+                if overflow and not self._topic_spilled:
+                    evicted.append(message)
+                    self._topic_spilled = True
+                kept.append(message)
+                kept_tokens.append(tokens)
+            elif overflow:
+                evicted.append(message)
+                self._token_total -= tokens
+                overflow -= 1
+            else:
+                kept.append(message)
+                kept_tokens.append(tokens)
+
+        self._message_history[self._pinned:] = kept
+        self._message_tokens[self._pinned:] = kept_tokens
+
+        with open(self._spill_path, 'a') as file:
+            for message in evicted:
+                file.write(json.dumps({'type': message.type, 'content': message.content}) + '\n')
+                if message is not self._topic_message:
+                    self._spilled_count += 1
+
 
     # getters & setters
 
@@ -265,8 +779,17 @@ class Actor:
             new_topic (str): The new topic to be set.
         """
         if new_topic:
+            self._flush_pending()
+
+            # the old topic is no longer pinned. If it's already in the spill file, it leaves memory now, so it isn't exported or spilled twice
+            if self._topic_spilled:
+                self._drop_message(self._topic_message)
+
             self._topic = new_topic
-            self._message_history.append(HumanMessage(content = new_topic))
+            self._topic_message = HumanMessage(content = new_topic)
+            self._topic_spilled = False
+            self._push_message(self._topic_message)
+            self._enforce_history_cap()
         
     @property
     def full_name(self) -> str:
@@ -419,6 +942,86 @@ class Actor:
         """
         self._temperature = value
     
+    @property
+    def has_output_budget(self) -> bool:
+        """
+        Gets whether any output limit has been set for the actor.
+
+        Returns:
+            bool: True if max_tokens, max_words or stop sequences are set.
+        """
+        return bool(self._max_tokens or self._max_words or self._stop)
+
+    @property
+    def output_stats(self) -> dict:
+        """
+        Gets how often the actor's responses overran the output budget.
+
+        Returns:
+            dict: turns, overruns, overrun_rate, trimmed_words and mid_sentence_cuts (trims that found no sentence end within the budget) so far.
+        """
+        return {
+            'turns': self._turns,
+            'overruns': self._overruns,
+            'overrun_rate': self._overruns / self._turns if self._turns else 0.0,
+            'trimmed_words': self._trimmed_words,
+            'mid_sentence_cuts': self._mid_sentence_cuts,
+        }
+
+    @property
+    def token_count(self) -> int:
+        """
+        Gets the number of prompt tokens in the in-memory message history, kept up to date as messages are added or evicted.
+        Messages heard but not yet materialized are not included; see pending_token_count. Once they are, their count is
+        derived from the pending count rather than by encoding the coalesced message again.
+
+        Returns:
+            int: The total token count.
+        """
+        return self._token_total
+
+    @property
+    def pending_token_count(self) -> int:
+        """
+        Gets the number of tokens heard but not yet added to the history. Counted when read, as hearing is kept cheap,
+        though each distinct message is only ever encoded once (see token_counter.count_tokens).
+        Once flushed, the messages cost a little more: their separators, the human message template and its per-message overhead.
+
+        Returns:
+            int: The pending token count.
+        """
+        return sum(count_tokens(message) for message in self._pending)
+
+    @property
+    def message_tokens(self) -> List[int]:
+        """
+        Gets the token count of each message in the in-memory history.
+
+        Returns:
+            List[int]: The token counts, in history order.
+        """
+        return list(self._message_tokens)
+
+    @property
+    def max_history(self) -> Optional[int]:
+        """
+        Gets the cap on in-memory messages, or None when the history is unbounded.
+
+        Returns:
+            Optional[int]: The maximum number of in-memory messages, excluding the system messages.
+        """
+        return self._max_history
+
+    @property
+    def spilled_count(self) -> int:
+        """
+        Gets the number of messages evicted to disk in bounded-memory mode.
+
+        Returns:
+            int: The number of spilled messages.
+        """
+        return self._spilled_count
+
     # Get the Actor's most recent prompt input 
     @property
     def last_prompt(self) ->str:
@@ -428,6 +1031,7 @@ class Actor:
         Returns:
             str: The content of the second to last message.
         """
+        self._flush_pending()
         if len(self._message_history) < 2:
             return ''
         
@@ -442,5 +1046,6 @@ class Actor:
         Returns:
             str: The content of the last message in memory.
         """
+        self._flush_pending()
         return self._message_history[-1].content
 
@@ -10,7 +10,12 @@
 
 
 # Python
+import os
 import random
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Optional
 
 # Anvil
@@ -19,16 +24,34 @@ import anvil.server
 
 # import local classes
 from Actor import Actor
+from tracer import tracer
 
 class Conversation:
 
-    def __init__(self, rounds: int = 6) -> None:
+    # Class variables
+    round_modes: tuple = ('sequential', 'simultaneous')
+
+    def __init__(self, rounds: int = 6, max_history: Optional[int] = None, spill_dir: Optional[str] = None, round_mode: str = 'sequential', facilitated: bool = True,
+                 max_tokens: Optional[int] = None, max_words: Optional[int] = None, stop: Optional[List[str]] = None,
+                 speculative: bool = False, speculative_depth: int = 2) -> None:
         """
         Initializes the Conversation instance with the specified number of rounds.
 
         Args:
             rounds (int): The maximum number of rounds for the conversation. Defaults to 6.
+            max_history (Optional[int]): Caps each stakeholder's in-memory message history, spilling older turns to disk. Defaults to None (unbounded).
+            spill_dir (Optional[str]): The directory receiving spilled turns. Defaults to a fresh temporary directory.
+            round_mode (str): 'sequential' (each stakeholder hears everyone before them) or 'simultaneous' (everyone responds to the same snapshot in one batch). Defaults to 'sequential'.
+            facilitated (bool): Whether the human facilitator is invited to comment after each round. Defaults to True.
+            max_tokens (Optional[int]): Default generation limit per utterance for stakeholders without an output budget of their own.
+            max_words (Optional[int]): Default word limit per utterance (emotes excluded); longer responses are trimmed to a sentence boundary.
+            stop (Optional[List[str]]): Default stop sequences for stakeholders' responses.
+            speculative (bool): Whether to draft the next round's first responses while the facilitator types. Sequential rounds only. Defaults to False.
+            speculative_depth (int): How many of the next round's speakers to draft. Defaults to 2.
         """
+        if round_mode not in self.round_modes:
+            raise ValueError(f"round_mode must be one of {self.round_modes}.")
+
         # all stakeholders (Actors) who'll participate in the workshop or meeting
         self._stakeholders: list[Actor] = []
         self._rounds: int = rounds
@@ -36,6 +59,15 @@ class Conversation:
         self._system_behavior: Optional[str] = None                 # System Message Behavior text from a TXT file. Defines how any Actor behaves in a conversation.
         self._system_company: Optional[str] = None                  # System Message Company text from a TXT file. Defines the Actors' corporate context.
         self._topic: str = 'Discuss whatever you like.'             # The current topic of the conversation
+        self._max_history: Optional[int] = max_history              # bounded-memory mode: cap on each stakeholder's in-memory history
+        self._spill_dir: Optional[str] = spill_dir                  # where stakeholders' evicted turns are written
+        self._round_mode: str = round_mode                          # how stakeholders take their turns within a round
+        self._facilitated: bool = facilitated                       # breakout groups run unattended
+        self._output_budget: dict = {'max_tokens': max_tokens, 'max_words': max_words, 'stop': stop}     # default limits on each utterance
+        self._speculative: bool = speculative                       # draft the next round during the facilitator's pause
+        self._speculative_depth: int = speculative_depth            # number of next-round speakers to draft
+        self._speculation: Optional[dict] = None                    # the drafts in progress for the next round
+        self._speculation_stats: dict = {'speculated': 0, 'committed': 0, 'saved': 0.0}
 
 
     def discuss_topic(self, topic: str) -> None:
@@ -45,46 +77,118 @@ class Conversation:
         Args:
             topic (str): The new topic of the conversation.
         """
-        self._topic = topic
-        # hand the topic to all members in the conversation
-        for member in self._stakeholders:
-            member.topic = topic
+        with tracer.span('topic'):
+            self._topic = topic
+            # hand the topic to all members in the conversation
+            for member in self._stakeholders:
+                member.topic = topic
 
-        print(f"{self._topic}\n\n")
+            print(f"{self._topic}\n\n")
 
-        # conduct the rounds
-        while self._current_round < self._rounds:
-            self._current_round += 1
-            print(f"\nRound {self._current_round} of {self._rounds}\n\n")
+            # conduct the rounds
+            while self._current_round < self._rounds:
+                self._current_round += 1
+                print(f"\nRound {self._current_round} of {self._rounds}\n\n")
 
-            self.conduct_round()
+                with tracer.span('round', number = self._current_round):
+                    if self._round_mode == 'simultaneous':
+                        self.conduct_simultaneous_round()
+                    else:
+                        self.conduct_round()
+
+            if self._speculative:
+                stats: dict = self.speculation_stats
+                print(f"Speculation: {stats['committed']} of {stats['speculated']} drafts committed ({stats['hit_rate']:.0%}), {stats['saved']:.1f}s saved\n")
 
 
     def conduct_round(self) -> None:
         """
         Conducts a round of communication among stakeholders.
         """
+        # drafts made during the facilitator's pause come with the speaking order they were made for
+        speculation: Optional[dict] = self._speculation
+        self._speculation = None
+
         # Copy and shuffle the list to ensure random order
-        remaining_actors = self._stakeholders.copy()
-        random.shuffle(remaining_actors)
+        with tracer.span('round.copy'):
+            if speculation:
+                remaining_actors = speculation['order']
+            else:
+                remaining_actors = self._stakeholders.copy()
+                random.shuffle(remaining_actors)
 
         # Iterate over the shuffled list of Actors
+        turn: int = 0
         while remaining_actors:
             actor: Actor = remaining_actors.pop()
-            response: str = actor.invoke()
+            with tracer.span('turn', actor = actor.first_name):
+                response: Optional[str] = None
+                if speculation and turn < len(speculation['futures']):
+                    response = self._commit_draft(actor, speculation['futures'][turn])
+                    if response is None:
+                        # later drafts assumed this turn's draft, so they are stale too
+                        speculation['cancelled'].set()
+                        speculation = None
+
+                if response is None:
+                    response = actor.invoke()
+                self._share_response(response, actor)
+            turn += 1
+
+        if speculation:
+            speculation['cancelled'].set()
+
+        self._invite_facilitator()
+
+
+    def conduct_simultaneous_round(self) -> None:
+        """
+        Conducts a round in which all stakeholders respond to the same snapshot of the conversation, e.g. while brainstorming.
+        The responses are generated in one batch, then broadcast together in roster order.
+        """
+        with tracer.span('turn', actors = len(self._stakeholders)):
+            responses: List[str] = Actor.batch_invoke(self._stakeholders)
+
+            for actor, response in zip(self._stakeholders, responses):
+                self._share_response(response, actor)
+
+        self._invite_facilitator()
+
+
+    def _share_response(self, response: str, actor: Actor) -> None:
+        """
+        Helper method to print a stakeholder's response and broadcast it, unless they passed or are done.
+
+        Args:
+            response (str): The stakeholder's response.
+            actor (Actor): The stakeholder who responded.
+        """
+        if '*Done*' in response:
+            print (f"**{actor.first_name}**: done\n\n")
+        elif '*Pass*' in response:
+            print (f"{actor.first_name}: pass\n\n")
+        else:
+            print (f'{response}\n\n')
+            self.broadcast_to_others(response, actor)
+
+
+    def _invite_facilitator(self) -> None:
+        """
+        Helper method to allow the human facilitator to comment at the end of each round.
+        """
+        if not self._facilitated:
+            return
+
+        if self._speculative and self._round_mode == 'sequential' and self._current_round < self._rounds:
+            self._start_speculation()
 
-            if '*Done*' in response:
-                print (f"**{actor.first_name}**: done\n\n")
-            elif '*Pass*' in response:
-                print (f"{actor.first_name}: pass\n\n")
-            else:
-                print (f'{response}\n\n')
-                self.broadcast_to_others(response, actor)
-        
-        # Allow the human facilitator to comment at the end of each round           
         try:
-            comment = input('Enter a comment: ')
+            # time spent waiting on the facilitator is traced separately from the stakeholders' turns
+            with tracer.span('facilitator'):
+                comment = input('Enter a comment: ')
             if comment and (comment != 'pass'):
+                # the drafts did not hear the comment, so they are discarded and the next round regenerates
+                self._discard_speculation()
                 self.broadcast_to_others(f'Facilitator: {comment}', None)
         except EOFError:
             print("Input ended unexpectedly.")
@@ -92,6 +196,154 @@ class Conversation:
             print(f"An error occurred during input: {e}")
 
 
+    def _start_speculation(self) -> None:
+        """
+        Helper method to pick the next round's speaking order and draft its first speakers' responses in the background.
+        Each draft assumes the facilitator passes and that the speakers drafted before it say exactly what was drafted for them.
+        """
+        order: list = self._stakeholders.copy()
+        random.shuffle(order)
+
+        # conduct_round() pops speakers from the end of the order
+        speakers: list = order[::-1][:self._speculative_depth]
+        snapshots: list = [speaker.snapshot_prompt() for speaker in speakers]
+        futures: List[Future] = [Future() for _ in speakers]
+        cancelled: threading.Event = threading.Event()
+
+        def run_drafts() -> None:
+            heard: List[str] = []
+            for speaker, snapshot, future in zip(speakers, snapshots, futures):
+                if cancelled.is_set():
+                    future.set_result(None)
+                    continue
+
+                started: float = time.perf_counter()
+                try:
+                    draft: dict = speaker.draft(snapshot, heard)
+                except Exception as e:
+                    future.set_exception(e)
+                    cancelled.set()
+                    continue
+
+                draft['duration'] = time.perf_counter() - started
+                future.set_result(draft)
+
+                # later speakers hear this one, unless they passed or are done
+                if draft['text'] and '*Done*' not in draft['text']:
+                    heard.append(draft['text'])
+
+        threading.Thread(target = run_drafts, daemon = True).start()
+
+        self._speculation = {'order': order, 'futures': futures, 'cancelled': cancelled}
+        self._speculation_stats['speculated'] += len(speakers)
+
+
+    def _discard_speculation(self) -> None:
+        """
+        Helper method to drop the drafts for the next round.
+        """
+        if self._speculation:
+            self._speculation['cancelled'].set()
+            self._speculation = None
+
+
+    def _commit_draft(self, actor: Actor, future: Future) -> Optional[str]:
+        """
+        Helper method to take a speaker's draft as their turn, waiting for it if it is still being generated.
+
+        Args:
+            actor (Actor): The speaker.
+            future (Future): The speaker's draft.
+
+        Returns:
+            Optional[str]: The speaker's response, or None if the draft failed or is stale.
+        """
+        started: float = time.perf_counter()
+        try:
+            draft: Optional[dict] = future.result()
+        except Exception:
+            return None
+        waited: float = time.perf_counter() - started
+
+        if draft is None:
+            return None
+
+        response: Optional[str] = actor.commit_draft(draft)
+        if response is not None:
+            self._speculation_stats['committed'] += 1
+            self._speculation_stats['saved'] += max(draft['duration'] - waited, 0.0)
+
+        return response
+
+
+    def run_breakouts(self, topic: str, group_size: int = 5, rounds: int = 3, summary_words: int = 60) -> List[str]:
+        """
+        Splits the stakeholders into breakout groups that discuss the topic in parallel, then broadcasts a compact
+        summary of each group's outcome to the whole conversation (the plenary).
+        Within a breakout, stakeholders only hear their own group, so prompts grow with the group rather than the roster.
+
+        Args:
+            topic (str): The topic for every breakout group.
+            group_size (int): The maximum number of stakeholders per group. Defaults to 5.
+            rounds (int): The number of rounds each group conducts. Defaults to 3.
+            summary_words (int): The word limit for each group's summary. Defaults to 60.
+
+        Returns:
+            List[str]: The summary broadcast by each group.
+        """
+        if group_size < 1:
+            raise ValueError("group_size must be a positive integer.")
+
+        # Copy and shuffle the list so that groups mix roles
+        members = self._stakeholders.copy()
+        random.shuffle(members)
+
+        groups: List[Conversation] = []
+        for start in range(0, len(members), group_size):
+            group = Conversation(rounds = rounds, round_mode = self._round_mode, facilitated = False)
+            group._system_behavior = self._system_behavior
+            group._system_company = self._system_company
+            # members already have their system message from the plenary, so skip add_stakeholder()
+            group._stakeholders = members[start:start + group_size]
+            groups.append(group)
+
+        def run_group(group: Conversation) -> tuple:
+            group.discuss_topic(topic)
+            return group._report_back(summary_words)
+
+        with ThreadPoolExecutor(max_workers = max(len(groups), 1)) as executor:
+            reports: list = list(executor.map(run_group, groups))
+
+        summaries: List[str] = []
+        for number, (rapporteur, summary) in enumerate(reports, start = 1):
+            names = ', '.join(member.full_name for member in groups[number - 1].stakeholders)
+            summary = f'Breakout group {number} ({names}): {summary}'
+            print (f'{summary}\n\n')
+            self.broadcast_to_others(summary, rapporteur)
+            summaries.append(summary)
+
+        return summaries
+
+
+    def _report_back(self, summary_words: int) -> tuple:
+        """
+        Helper method to have a breakout group's first willing member summarize its discussion for the plenary.
+
+        Args:
+            summary_words (int): The word limit for the summary.
+
+        Returns:
+            tuple: The rapporteur (Actor or None) and the summary text.
+        """
+        request = f'Facilitator: Please summarize the conclusions of your group in at most {summary_words} words, for the rest of the workshop.'
+        for member in self._stakeholders:
+            summary: str = member.invoke(request)
+            if '*Pass*' not in summary:
+                return member, summary
+
+        return None, 'No conclusions reported.'
+
+
     # add a bot to the conversation
     def add_stakeholder(self, new_member: Actor) -> None:
         """
@@ -106,6 +358,16 @@ class Conversation:
         new_member.behavior = self._system_behavior
         new_member.company = self._system_company
         new_member.create_system_message()
+
+        if not new_member.has_output_budget:
+            new_member.set_output_budget(**self._output_budget)
+
+        if self._max_history:
+            if not self._spill_dir:
+                self._spill_dir = tempfile.mkdtemp(prefix='conversation_spill_')
+            spill_path = os.path.join(self._spill_dir, f'{new_member.first_name}_{new_member.last_name}_{id(new_member)}.jsonl')
+            new_member.set_history_cap(self._max_history, spill_path)
+
         self._stakeholders.append(new_member)
 
 
@@ -117,10 +379,11 @@ class Conversation:
             message (str): The message to be broadcast.
             speaker (Optional[Actor]): The speaker of the message. Defaults to None.
         """
-        for member in self._stakeholders:
-            if member != speaker:
-                member.hear(message)
-                # print(f'{member.first_name} heard {speaker.first_name}\n\n')
+        with tracer.span('broadcast', listeners = len(self._stakeholders)):
+            for member in self._stakeholders:
+                if member != speaker:
+                    member.hear(message)
+                    # print(f'{member.first_name} heard {speaker.first_name}\n\n')
 
 
     def broadcast_topic(self, topic: str) -> None:
@@ -214,3 +477,58 @@ class Conversation:
             List[Actor]: The list of stakeholders.
         """
         return self._stakeholders
+
+    @property
+    def output_stats(self) -> dict:
+        """
+        Gets how often each stakeholder's responses overran their output budget.
+
+        Returns:
+            dict: Each stakeholder's output stats, keyed by full name.
+        """
+        return {member.full_name: member.output_stats for member in self._stakeholders}
+
+    @property
+    def speculation_stats(self) -> dict:
+        """
+        Gets how well drafting during the facilitator's pauses paid off.
+
+        Returns:
+            dict: speculated and committed drafts, hit_rate, and the model time saved in seconds.
+        """
+        stats: dict = dict(self._speculation_stats)
+        stats['hit_rate'] = stats['committed'] / stats['speculated'] if stats['speculated'] else 0.0
+        return stats
+
+    @property
+    def round_mode(self) -> str:
+        """
+        Gets how stakeholders take their turns within a round.
+
+        Returns:
+            str: 'sequential' or 'simultaneous'.
+        """
+        return self._round_mode
+
+    @round_mode.setter
+    def round_mode(self, new_mode: str) -> None:
+        """
+        Sets how stakeholders take their turns within a round, e.g. 'simultaneous' while brainstorming.
+
+        Args:
+            new_mode (str): 'sequential' or 'simultaneous'.
+        """
+        if new_mode in self.round_modes:
+            self._round_mode = new_mode
+        else:
+            raise ValueError(f"round_mode must be one of {self.round_modes}.")
+
+    @property
+    def spill_dir(self) -> Optional[str]:
+        """
+        Gets the directory receiving stakeholders' spilled turns in bounded-memory mode.
+
+        Returns:
+            Optional[str]: The spill directory, or None if nothing has been spilled.
+        """
+        return self._spill_dir
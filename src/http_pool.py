@@ -0,0 +1,254 @@
+# http_pool.py
+# A shared, keep-alive HTTP connection pool for every chat model in the process.
+# Bob Howard
+# kalharri@gmail.com
+
+# usage:
+    # pool = configure_http_pool(max_connections = 20, timeout = 60.0)
+    # Actor.set_convo_bot(ChatOpenAI(model = 'gpt-4o', http_client = pool.client, timeout = pool.timeout))
+    # (the OpenAI client sends its own timeout with every request, so the pool's timeout must be handed to the model, too)
+    # print(pool.stats)
+
+
+# python
+import threading
+import time
+from typing import Optional
+
+# third-party
+import httpx
+
+# HTTP/2 needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE: bool = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    """
+    A response body that reports, once closed, whether it was read without error.
+    """
+
+    def __init__(self, stream: httpx.SyncByteStream, record) -> None:
+        self._stream: httpx.SyncByteStream = stream
+        self._record = record
+        self._failed: bool = False
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                yield chunk
+        except Exception:
+            self._failed = True
+            raise
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if self._record:
+                self._record(self._failed)
+                self._record = None
+
+
+class _TracingTransport(httpx.HTTPTransport):
+    """
+    An HTTP transport that reports, for each request, whether a pooled connection was reused and how long the request waited for one.
+    """
+
+    def __init__(self, pool: 'HttpPool', **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._owner: 'HttpPool' = pool
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started: float = time.perf_counter()
+        state: dict = {'acquired': None, 'connected': False}
+        outer_trace = request.extensions.get('trace')
+
+        # httpcore emits its first trace event once the request holds a connection;
+        # a 'connect_tcp' event means that connection had to be opened for this request
+        def trace(event_name: str, info: dict) -> None:
+            if state['acquired'] is None:
+                state['acquired'] = time.perf_counter()
+            if event_name.endswith('connect_tcp.started'):
+                state['connected'] = True
+            if outer_trace:
+                outer_trace(event_name, info)
+
+        request.extensions['trace'] = trace
+        try:
+            response: httpx.Response = super().handle_request(request)
+        except Exception:
+            # failed requests count, too: a PoolTimeout is the longest wait of all
+            acquired: float = state['acquired'] if state['acquired'] is not None else time.perf_counter()
+            self._owner._record(reused = False, wait = acquired - started, failed = True)
+            raise
+
+        # the body is read after this returns, so the request is only recorded once it has been read (or failed to be)
+        wait: float = state['acquired'] - started if state['acquired'] is not None else 0.0
+        reused: bool = not state['connected']
+        response.stream = _RecordingStream(response.stream, lambda failed: self._owner._record(reused = reused and not failed, wait = wait, failed = failed))
+        return response
+
+
+class HttpPool:
+    """
+    A configurable keep-alive connection pool shared by all Actors and Conversations, with stats on connection reuse and wait time.
+
+    Attributes:
+        client (httpx.Client): The pooled client to hand to chat models, e.g. ChatOpenAI(http_client = pool.client).
+        stats (dict): Request count, connection reuse rate and wait times so far.
+    """
+
+    def __init__(self, max_connections: int = 20, max_keepalive_connections: int = 10, keepalive_expiry: float = 30.0,
+                 timeout: float = 60.0, connect_timeout: float = 10.0, http2: bool = True) -> None:
+        """
+        Initializes the pool.
+
+        Args:
+            max_connections (int): The maximum number of concurrent connections. Defaults to 20.
+            max_keepalive_connections (int): The maximum number of idle connections kept alive. Defaults to 10.
+            keepalive_expiry (float): Seconds an idle connection is kept alive. Defaults to 30.0.
+            timeout (float): Seconds allowed for reading, writing, and waiting for a pooled connection. Defaults to 60.0.
+            connect_timeout (float): Seconds allowed for opening a connection. Defaults to 10.0.
+            http2 (bool): Whether to negotiate HTTP/2, when the h2 package is installed. Defaults to True.
+        """
+        self._lock: threading.Lock = threading.Lock()
+        self._requests: int = 0
+        self._reused: int = 0
+        self._failed: int = 0
+        self._total_wait: float = 0.0
+        self._max_wait: float = 0.0
+
+        limits = httpx.Limits(max_connections = max_connections, max_keepalive_connections = max_keepalive_connections, keepalive_expiry = keepalive_expiry)
+        self._http2: bool = http2 and HTTP2_AVAILABLE
+        transport = _TracingTransport(self, limits = limits, http2 = self._http2)
+        self._timeout: httpx.Timeout = httpx.Timeout(timeout, connect = connect_timeout)
+        self._client: httpx.Client = httpx.Client(transport = transport, timeout = self._timeout)
+
+
+    def _record(self, reused: bool, wait: float, failed: bool = False) -> None:
+        """
+        Helper method to accumulate the stats of one request.
+
+        Args:
+            reused (bool): Whether the request was sent on an existing connection.
+            wait (float): Seconds the request waited for a connection (or until it failed).
+            failed (bool): Whether the request failed, e.g. with a PoolTimeout or a connect error.
+        """
+        with self._lock:
+            self._requests += 1
+            self._reused += int(reused)
+            self._failed += int(failed)
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+
+    def reset_stats(self) -> None:
+        """
+        Clears the accumulated stats.
+        """
+        with self._lock:
+            self._requests = 0
+            self._reused = 0
+            self._failed = 0
+            self._total_wait = 0.0
+            self._max_wait = 0.0
+
+
+    def close(self) -> None:
+        """
+        Closes every pooled connection.
+        """
+        self._client.close()
+
+
+    # getters
+
+    @property
+    def client(self) -> httpx.Client:
+        """
+        Gets the pooled client.
+
+        Returns:
+            httpx.Client: The client to hand to chat models.
+        """
+        return self._client
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        """
+        Gets the pool's timeouts. Pass them to the chat model as well, e.g. ChatOpenAI(timeout = pool.timeout),
+        as the OpenAI client overrides the client's default timeout on every request.
+
+        Returns:
+            httpx.Timeout: The connect, read, write and pool timeouts.
+        """
+        return self._timeout
+
+    @property
+    def http2(self) -> bool:
+        """
+        Gets whether the pool negotiates HTTP/2.
+
+        Returns:
+            bool: True if HTTP/2 is enabled.
+        """
+        return self._http2
+
+    @property
+    def stats(self) -> dict:
+        """
+        Gets the pool's stats so far.
+
+        Returns:
+            dict: requests, reused, failed, reuse_rate, mean_wait and max_wait (in seconds).
+        """
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'reused': self._reused,
+                'failed': self._failed,
+                'reuse_rate': self._reused / self._requests if self._requests else 0.0,
+                'mean_wait': self._total_wait / self._requests if self._requests else 0.0,
+                'max_wait': self._max_wait,
+            }
+
+
+# the process-wide pool
+_shared_pool: Optional[HttpPool] = None
+_shared_pool_lock: threading.Lock = threading.Lock()
+
+
+def configure_http_pool(**kwargs) -> HttpPool:
+    """
+    Creates the process-wide pool, replacing (and closing) any existing one.
+
+    Args:
+        **kwargs: The HttpPool settings.
+
+    Returns:
+        HttpPool: The new shared pool.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool:
+            _shared_pool.close()
+        _shared_pool = HttpPool(**kwargs)
+        return _shared_pool
+
+
+def get_http_pool() -> HttpPool:
+    """
+    Gets the process-wide pool, creating one with default settings if needed.
+
+    Returns:
+        HttpPool: The shared pool.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if not _shared_pool:
+            _shared_pool = HttpPool()
+        return _shared_pool
@@ -30,6 +30,7 @@ import anvil.server
 # local classes
 from Actor import Actor
 from Conversation import Conversation
+from http_pool import configure_http_pool
 
 
 # set required API keys
@@ -38,11 +39,15 @@ openai_api_key = os.getenv('OPENAI_API_KEY')
 anvil_uplink_key = os.getenv('ANVIL_UPLINK_KEY')
 # anvil.server.connect(anvil_uplink_key)
 
+# One keep-alive connection pool is shared by every model call in the process
+http_pool = configure_http_pool(max_connections = 20, timeout = 60.0)
+
 # Set up Actor class' required LLM instance for generating chatbot responses
-Actor.set_convo_bot(ChatOpenAI(model = 'gpt-4o', temperature = 0.65))
+# (the model sends its own timeout with every request, so it gets the pool's timeout, too)
+Actor.set_convo_bot(ChatOpenAI(model = 'gpt-4o', temperature = 0.65, http_client = http_pool.client, timeout = http_pool.timeout))
 
-# create a meeting
-meeting = Conversation(rounds = 15)
+# create a meeting, holding stakeholders to the topic's 100-word limit
+meeting = Conversation(rounds = 15, max_tokens = 250, max_words = 100)
 
 # Set up Conversation class' System Message prefix text from a txt file.
 # This conditions each stakeholder on how to behave, regardless of role.
@@ -0,0 +1,108 @@
+# Memory benchmark for long-running Conversations
+# Bob Howard
+# kalharri@gmail.com
+
+# Tracks peak memory per round with tracemalloc, and the largest stakeholder's own message history, so bounded-memory mode
+# can be shown to plateau.
+# No LLM is called: a canned bot stands in for the model so that only the conversation bookkeeping is measured.
+
+# usage:
+    # python memory_benchmark.py --stakeholders 24 --rounds 200 --max-history 40
+    # python memory_benchmark.py --stakeholders 24 --rounds 200               (unbounded, for comparison)
+
+
+# python
+import argparse
+import sys
+import tempfile
+import tracemalloc
+from typing import Optional
+
+# langchain
+from langchain.schema import AIMessage
+
+# local classes
+from Actor import Actor
+from Conversation import Conversation
+
+
+class CannedBot:
+    """
+    Stands in for the chat model, returning a fixed-length utterance for every invocation.
+    """
+
+    def __init__(self, words: int = 100) -> None:
+        self.temperature: float = 0.0
+        self._turn: int = 0
+        self._words: int = words
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        self._turn += 1
+        return AIMessage(content=' '.join(f'idea{self._turn}-{i}' for i in range(self._words)))
+
+
+def held_bytes(actor: Actor) -> int:
+    """
+    Measures the message text a stakeholder holds in memory: its history and the messages it has heard but not yet added.
+    Text shared with other stakeholders, e.g. a broadcast, is counted for each of them.
+
+    Args:
+        actor (Actor): The stakeholder.
+
+    Returns:
+        int: The size of the held text in bytes.
+    """
+    return sum(sys.getsizeof(message.content) for message in actor._message_history) + sum(sys.getsizeof(text) for text in actor._pending)
+
+
+def run(stakeholders: int, rounds: int, max_history: Optional[int], words: int) -> None:
+    """
+    Runs a simulated session and prints the memory profile of each round.
+
+    Args:
+        stakeholders (int): The number of Actors in the meeting.
+        rounds (int): The number of rounds to simulate.
+        max_history (Optional[int]): The in-memory history cap, or None for unbounded.
+        words (int): The number of words in each utterance.
+    """
+    Actor.set_convo_bot(CannedBot(words))
+
+    tracemalloc.start()
+
+    meeting = Conversation(rounds = rounds, max_history = max_history, spill_dir = tempfile.mkdtemp(prefix='memory_benchmark_'))
+    meeting.behavior = 'Behave like a workshop participant.'
+    meeting.company = 'A company that makes alpine survival gear.'
+    for i in range(stakeholders):
+        meeting.add_stakeholder(Actor(first_name = f'Stakeholder{i}', last_name = 'Bench', role = 'Tester'))
+    meeting.broadcast_topic('Brainstorm features for a new alpine survival system.')
+
+    print(f"stakeholders={stakeholders} rounds={rounds} max_history={max_history} words={words}\n")
+    print(f"{'round':>6} {'current KB':>12} {'peak KB':>12} {'avg peak KB/stakeholder':>24} {'max held KB/stakeholder':>24}")
+
+    # mirror Conversation.conduct_round, minus the shuffle and the facilitator's pause
+    for round_number in range(1, rounds + 1):
+        tracemalloc.reset_peak()
+
+        for actor in meeting.stakeholders:
+            response: str = actor.invoke()
+            meeting.broadcast_to_others(response, actor)
+
+        current, peak = tracemalloc.get_traced_memory()
+        held: int = max(held_bytes(actor) for actor in meeting.stakeholders)
+        print(f"{round_number:>6} {current / 1024:>12.1f} {peak / 1024:>12.1f} {peak / 1024 / stakeholders:>24.2f} {held / 1024:>24.2f}")
+
+    tracemalloc.stop()
+
+    spilled: int = sum(actor.spilled_count for actor in meeting.stakeholders)
+    print(f"\nmessages spilled to {meeting.spill_dir}: {spilled}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Track peak memory, and the largest stakeholder history, per round of a simulated Conversation.')
+    parser.add_argument('--stakeholders', type = int, default = 24)
+    parser.add_argument('--rounds', type = int, default = 100)
+    parser.add_argument('--max-history', type = int, default = None, help = 'in-memory message cap per stakeholder; omit for unbounded')
+    parser.add_argument('--words', type = int, default = 100, help = 'words per utterance')
+    args = parser.parse_args()
+
+    run(args.stakeholders, args.rounds, args.max_history, args.words)
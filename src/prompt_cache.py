@@ -0,0 +1,108 @@
+# prompt_cache.py
+# Measures how much of each prompt a provider's prefix cache could reuse.
+# Bob Howard
+# kalharri@gmail.com
+
+# Providers with prompt caching reuse the longest prefix of a prompt that they have seen before.
+# The meter below mirrors that at message granularity: a message counts as cached when it, and every
+# message before it, matches the start of an earlier prompt from any Actor.
+
+# usage:
+    # from prompt_cache import prefix_cache
+    # meeting.discuss_topic(...)
+    # print(prefix_cache.stats)
+
+
+# python
+import threading
+
+
+class PrefixCacheMeter:
+    """
+    Tracks the share of prompt content that repeats a prefix of an earlier prompt.
+
+    Attributes:
+        stats (dict): Prompt count, prompt and cached characters, and the hit rate so far.
+    """
+
+    def __init__(self, max_prefixes: int = 20_000) -> None:
+        """
+        Initializes the meter.
+
+        Args:
+            max_prefixes (int): The number of distinct prefixes remembered before the memory is reset, bounding the meter to a few MB. Defaults to 20,000.
+        """
+        self._lock: threading.Lock = threading.Lock()
+        self._max_prefixes: int = max_prefixes
+        self._seen: set = set()                 # hashes of every message-prefix sent so far
+        self._prompts: int = 0
+        self._prompt_chars: int = 0
+        self._cached_chars: int = 0
+
+
+    def record(self, messages: list) -> int:
+        """
+        Records a prompt about to be sent to the model.
+
+        Args:
+            messages (list): The prompt's messages.
+
+        Returns:
+            int: The number of leading characters an ideal prefix cache would have reused.
+        """
+        with self._lock:
+            prefix_hash: int = 0
+            cached: int = 0
+            total: int = 0
+            matching: bool = True
+
+            for message in messages:
+                length: int = len(message.content)
+                total += length
+                prefix_hash = hash((prefix_hash, message.type, message.content))
+
+                if matching and prefix_hash in self._seen:
+                    cached += length
+                else:
+                    matching = False
+                    self._seen.add(prefix_hash)
+
+            if len(self._seen) > self._max_prefixes:
+                self._seen.clear()
+
+            self._prompts += 1
+            self._prompt_chars += total
+            self._cached_chars += cached
+            return cached
+
+
+    def reset(self) -> None:
+        """
+        Forgets every prefix and clears the stats.
+        """
+        with self._lock:
+            self._seen.clear()
+            self._prompts = 0
+            self._prompt_chars = 0
+            self._cached_chars = 0
+
+
+    @property
+    def stats(self) -> dict:
+        """
+        Gets the meter's stats so far.
+
+        Returns:
+            dict: prompts, prompt_chars, cached_chars and hit_rate (the cached share of all prompt characters).
+        """
+        with self._lock:
+            return {
+                'prompts': self._prompts,
+                'prompt_chars': self._prompt_chars,
+                'cached_chars': self._cached_chars,
+                'hit_rate': self._cached_chars / self._prompt_chars if self._prompt_chars else 0.0,
+            }
+
+
+# the process-wide meter, fed by Actor before every model call
+prefix_cache: PrefixCacheMeter = PrefixCacheMeter()
@@ -3,10 +3,16 @@
 
 from langchain.prompts import PromptTemplate
 
-# Template for system messages
-system_message_template = PromptTemplate(
-    input_variables=["behavior", "company", "persona"],
-    template="{behavior}\n\n{company}\n\n{persona}"
+# Templates for system messages. The shared part is identical for every Actor and comes first,
+# so that providers with prefix caching can reuse it; the Actor's own persona follows.
+shared_system_template = PromptTemplate(
+    input_variables=["behavior", "company"],
+    template="{behavior}\n\n{company}"
+)
+
+persona_system_template = PromptTemplate(
+    input_variables=["persona"],
+    template="{persona}"
 )
 
 # Template for human messages
@@ -0,0 +1,67 @@
+# Token accounting benchmark
+# Bob Howard
+# kalharri@gmail.com
+
+# Shows that keeping an Actor's token count up to date costs the same per message however long the history gets,
+# while recounting the whole history, as each invoke would otherwise have to, grows with it.
+# No LLM is called.
+
+# usage:
+    # python token_benchmark.py --messages 5000 --step 500
+
+
+# python
+import argparse
+import time
+
+# local classes
+from Actor import Actor
+from token_counter import count_message_tokens, count_tokens
+
+
+def run(messages: int, step: int, words: int) -> None:
+    """
+    Appends messages to an Actor's history and prints the cost of the incremental update against a full recount.
+
+    Args:
+        messages (int): The number of messages to append.
+        step (int): The number of messages timed per row.
+        words (int): The number of words in each message.
+    """
+    actor = Actor(first_name = 'Token', last_name = 'Bench', role = 'Tester')
+    actor.behavior = 'Behave like a workshop participant.'
+    actor.company = 'A company that makes alpine survival gear.'
+    actor.create_system_message()
+
+    utterance: str = ' '.join(f'idea{i}' for i in range(words))
+    count: int = 0
+
+    print(f"messages={messages} words={words}\n")
+    print(f"{'history':>8} {'tokens':>10} {'update us/msg':>14} {'recount us':>12}")
+
+    for start in range(0, messages, step):
+        started: float = time.perf_counter()
+        for _ in range(step):
+            # a distinct text per message, so count_tokens' memo can't answer for it
+            count += 1
+            actor._append_message('human', f'{count} {utterance}')
+        update: float = (time.perf_counter() - started) / step
+
+        # what a full recount of the history would cost at this length, encoding every message afresh
+        count_tokens.cache_clear()
+        started = time.perf_counter()
+        recount: int = sum(count_message_tokens(message) for message in actor._message_history)
+        recount_time: float = time.perf_counter() - started
+
+        assert recount == actor.token_count
+        print(f"{start + step:>8} {actor.token_count:>10} {update * 1e6:>14.1f} {recount_time * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Time incremental token accounting of an Actor's history against full recounts.")
+    parser.add_argument('--messages', type = int, default = 5000)
+    parser.add_argument('--step', type = int, default = 500, help = 'messages timed per row')
+    parser.add_argument('--words', type = int, default = 100, help = 'words per message')
+    args = parser.parse_args()
+
+    run(args.messages, args.step, args.words)
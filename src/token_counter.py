@@ -0,0 +1,129 @@
+# token_counter.py
+# Local, pluggable token counting for Actor message histories.
+# Bob Howard
+# kalharri@gmail.com
+
+# usage:
+    # from token_counter import count_tokens, set_tokenizer, use_tiktoken
+    # use_tiktoken('gpt-4')                         # or any tiktoken encoding name, e.g. 'cl100k_base'
+    # set_tokenizer(lambda text: len(text.split()))  # or any callable returning a token count
+
+
+# python
+from functools import lru_cache
+from typing import Callable, Optional
+
+# tiktoken is the default tokenizer, when installed
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# tokens the chat format adds around each message (role and separators), on top of its content
+MESSAGE_OVERHEAD: int = 4
+
+
+@lru_cache(maxsize = 8)
+def _encoding(name: str):
+    """
+    Loads a tiktoken encoding, by model or encoding name, once per process.
+
+    Args:
+        name (str): A model name (e.g. 'gpt-4') or an encoding name (e.g. 'cl100k_base').
+
+    Returns:
+        tiktoken.Encoding: The encoding.
+    """
+    try:
+        return tiktoken.encoding_for_model(name)
+    except KeyError:
+        return tiktoken.get_encoding(name)
+
+
+def _approximate_tokens(text: str) -> int:
+    """
+    Estimates a token count at roughly four characters per token, for when no tokenizer is installed.
+    """
+    return (len(text) + 3) // 4
+
+
+@lru_cache(maxsize = 1)
+def _default_encoding():
+    """
+    Loads the default encoding on first use, or None if tiktoken is missing or its encoding can't be loaded (e.g. offline).
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return _encoding('cl100k_base')
+    except Exception:
+        return None
+
+
+def _default_tokenizer(text: str) -> int:
+    """
+    Counts tokens with tiktoken's cl100k_base encoding, falling back to an estimate without it.
+    """
+    encoding = _default_encoding()
+    if encoding is None:
+        return _approximate_tokens(text)
+    return len(encoding.encode(text, disallowed_special = ()))
+
+
+_tokenizer: Callable[[str], int] = _default_tokenizer
+
+
+def set_tokenizer(tokenizer: Callable[[str], int]) -> None:
+    """
+    Replaces the tokenizer used to count tokens.
+
+    Args:
+        tokenizer (Callable[[str], int]): A callable returning the number of tokens in a text.
+    """
+    global _tokenizer
+    _tokenizer = tokenizer
+    count_tokens.cache_clear()
+
+
+def use_tiktoken(name: str = 'cl100k_base') -> None:
+    """
+    Counts tokens with a tiktoken encoding.
+
+    Args:
+        name (str): A model name (e.g. 'gpt-4') or an encoding name. Defaults to 'cl100k_base'.
+    """
+    if tiktoken is None:
+        raise ImportError("tiktoken is not installed. Please pip install tiktoken, or use set_tokenizer().")
+
+    encoding = _encoding(name)
+    set_tokenizer(lambda text: len(encoding.encode(text, disallowed_special = ())))
+
+
+# memoized, as a broadcast hands every listener the very same string
+@lru_cache(maxsize = 4096)
+def count_tokens(text: Optional[str]) -> int:
+    """
+    Counts the tokens of a text with the current tokenizer, encoding each distinct text once.
+
+    Args:
+        text (Optional[str]): The text to count.
+
+    Returns:
+        int: The number of tokens.
+    """
+    return _tokenizer(text) if text else 0
+
+
+def count_message_tokens(message) -> int:
+    """
+    Counts the tokens a chat message adds to a prompt.
+
+    Args:
+        message: A langchain message.
+
+    Returns:
+        int: The tokens of its content plus the per-message overhead.
+    """
+    return count_tokens(message.content) + MESSAGE_OVERHEAD
+
@@ -0,0 +1,206 @@
+# tracer.py
+# A lightweight span tracer for the conversation hot paths: topic → round → turn → model call, broadcast, prompt formatting and token counting.
+# Bob Howard
+# kalharri@gmail.com
+
+# usage:
+    # from tracer import tracer
+    # tracer.enable()
+    # meeting.discuss_topic(...)
+    # tracer.export_chrome_trace('trace.json')        # open in chrome://tracing or https://ui.perfetto.dev
+    # tracer.export_folded('trace.folded')            # feed to flamegraph.pl or speedscope
+
+
+# python
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+
+class _NullSpan:
+    """
+    The span handed out while tracing is disabled. Entering and exiting it does nothing.
+    """
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SPAN: _NullSpan = _NullSpan()
+
+
+class _Span:
+    """
+    A timed section of code, nested inside whichever span was open on the same thread when it started.
+    """
+
+    __slots__ = ('_tracer', '_name', '_args', '_start', '_child_time', '_stack')
+
+    def __init__(self, tracer: 'Tracer', name: str, args: dict) -> None:
+        self._tracer: 'Tracer' = tracer
+        self._name: str = name
+        self._args: dict = args
+        self._child_time: int = 0
+
+    def __enter__(self) -> '_Span':
+        self._stack: list = self._tracer._stack()
+        self._stack.append(self)
+        self._start: int = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        duration: int = time.perf_counter_ns() - self._start
+        self._stack.pop()
+
+        if self._stack:
+            self._stack[-1]._child_time += duration
+
+        path: str = ';'.join([span._name for span in self._stack] + [self._name])
+        self._tracer._record(self._name, path, self._start, duration, duration - self._child_time, self._args)
+
+
+class Tracer:
+    """
+    Collects nested span timings when enabled, and costs a single flag check per span when disabled.
+
+    Attributes:
+        enabled (bool): Whether spans are being recorded.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Initializes the tracer.
+
+        Args:
+            enabled (bool): Whether to start recording straight away. Defaults to False.
+        """
+        self.enabled: bool = enabled
+        self._local: threading.local = threading.local()
+        self._events: list = []
+        self._origin: int = time.perf_counter_ns()
+
+
+    def enable(self) -> None:
+        """
+        Starts recording spans.
+        """
+        self.enabled = True
+
+
+    def disable(self) -> None:
+        """
+        Stops recording spans. Already recorded spans are kept.
+        """
+        self.enabled = False
+
+
+    def clear(self) -> None:
+        """
+        Discards the recorded spans.
+        """
+        self._events = []
+        self._origin = time.perf_counter_ns()
+
+
+    def span(self, name: str, **args):
+        """
+        Opens a span, to be used as a context manager: with tracer.span('turn', actor = 'Priya'): ...
+
+        Args:
+            name (str): The name of the span, e.g. 'turn' or 'llm.invoke'.
+            **args: Extra details shown with the span in the Chrome trace.
+
+        Returns:
+            The span context manager.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+
+    def _stack(self) -> list:
+        """
+        Helper method to get the open spans of the calling thread.
+
+        Returns:
+            list: The calling thread's span stack.
+        """
+        stack: Optional[list] = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+    def _record(self, name: str, path: str, start: int, duration: int, self_time: int, args: dict) -> None:
+        """
+        Helper method to store a finished span. Times are in nanoseconds.
+        """
+        self._events.append((name, path, start, duration, self_time, threading.get_ident(), args))
+
+
+    def summary(self) -> dict:
+        """
+        Totals the recorded spans by name.
+
+        Returns:
+            dict: For each span name, its count, total and self (excluding nested spans) time in seconds.
+        """
+        totals: dict = {}
+        for name, _, _, duration, self_time, _, _ in self._events:
+            entry: dict = totals.setdefault(name, {'count': 0, 'total': 0.0, 'self': 0.0})
+            entry['count'] += 1
+            entry['total'] += duration / 1e9
+            entry['self'] += self_time / 1e9
+        return totals
+
+
+    def export_chrome_trace(self, file_path: str) -> None:
+        """
+        Writes the recorded spans in the Chrome trace event format, viewable in chrome://tracing or Perfetto.
+
+        Args:
+            file_path (str): The JSON file to write.
+        """
+        pid: int = os.getpid()
+        events: list = [
+            {
+                'name': name,
+                'cat': 'conversation',
+                'ph': 'X',
+                'ts': (start - self._origin) / 1000,
+                'dur': duration / 1000,
+                'pid': pid,
+                'tid': tid,
+                'args': {key: str(value) for key, value in args.items()},
+            }
+            for name, _, start, duration, _, tid, args in self._events
+        ]
+
+        with open(file_path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+
+    def export_folded(self, file_path: str) -> None:
+        """
+        Writes the recorded spans as folded stacks (one 'topic;round;turn;llm.invoke <microseconds>' line per stack),
+        the input format of flamegraph.pl and speedscope.
+
+        Args:
+            file_path (str): The text file to write.
+        """
+        stacks: dict = {}
+        for _, path, _, _, self_time, _, _ in self._events:
+            stacks[path] = stacks.get(path, 0) + self_time
+
+        with open(file_path, 'w') as file:
+            for path, self_time in stacks.items():
+                file.write(f'{path} {self_time // 1000}\n')
+
+
+# the process-wide tracer used by Actor and Conversation. Disabled until tracer.enable() is called
+tracer: Tracer = Tracer(enabled = os.getenv('CONVERSATION_TRACE', '') == '1')
@@ -0,0 +1,5 @@
+# The application modules live flat in src/ and import each other by module name
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,76 @@
+# Tests for the Actor's bounded-memory mode
+
+from langchain.schema import AIMessage
+
+from Actor import Actor
+
+
+class CannedBot:
+    """
+    Stands in for the chat model, numbering its replies.
+    """
+
+    def __init__(self) -> None:
+        self.temperature: float = 0.0
+        self._turn: int = 0
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        self._turn += 1
+        return AIMessage(content=f'reply {self._turn}.')
+
+
+def make_actor(tmp_path, max_history: int = 4) -> Actor:
+    Actor.set_convo_bot(CannedBot())
+    actor = Actor(first_name='Test', last_name='Actor', role='Tester')
+    actor.behavior = 'behavior'
+    actor.company = 'company'
+    actor.create_system_message()
+    actor.set_history_cap(max_history, str(tmp_path / 'spill.jsonl'))
+    return actor
+
+
+def test_export_keeps_order_across_spills(tmp_path):
+    actor = make_actor(tmp_path)
+    actor.topic = 'TOPIC'
+    for turn in range(6):
+        actor.hear(f'heard {turn}.')
+        actor.invoke()
+
+    assert actor.spilled_count > 0
+    assert len(actor._message_history) - 2 <= 4
+
+    contents = [message.content for message in actor.export_history()[2:]]
+    assert contents[0] == 'TOPIC'
+    assert contents[1:] == [text for turn in range(6) for text in (f'heard {turn}.', f'reply {turn + 1}.')]
+
+
+def test_topic_change_after_spill_exports_each_topic_once(tmp_path):
+    actor = make_actor(tmp_path)
+    actor.topic = 'TOPIC'
+    for turn in range(6):
+        actor.hear(f'heard {turn}.')
+        actor.invoke()
+
+    actor.topic = 'TOPIC2'
+    for turn in range(6, 12):
+        actor.hear(f'heard {turn}.')
+        actor.invoke()
+
+    contents = [message.content for message in actor.export_history()[2:]]
+    assert contents.count('TOPIC') == 1
+    assert contents.count('TOPIC2') == 1
+    assert contents.index('TOPIC') == 0
+    assert contents[contents.index('TOPIC2') - 1] == 'reply 6.'
+    assert contents[-1] == 'reply 12.'
+    assert len(contents) == 2 + 24
+
+
+def test_stale_spill_file_is_not_exported(tmp_path):
+    (tmp_path / 'spill.jsonl').write_text('{"type": "human", "content": "STALE FROM LAST RUN"}\n')
+    actor = make_actor(tmp_path)
+    for turn in range(6):
+        actor.hear(f'heard {turn}.')
+        actor.invoke()
+
+    assert actor.spilled_count > 0
+    assert 'STALE FROM LAST RUN' not in [message.content for message in actor.export_history()]
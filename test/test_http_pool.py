@@ -0,0 +1,113 @@
+# Tests for the shared HTTP connection pool, against a local stub server
+
+import http.server
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from http_pool import HttpPool
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answers every request with a small keep-alive response after a short delay, standing in for the model's latency,
+    so callers queue for connections rather than race for them. /truncated breaks off the body part way.
+    """
+    protocol_version = 'HTTP/1.1'
+    delay = 0.01
+
+    def do_GET(self) -> None:
+        time.sleep(self.delay)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if self.path == '/truncated':
+            self.send_header('Content-Length', str(len(body) * 2))
+            self.close_connection = True
+        else:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_sequential_requests_reuse_one_connection(stub_url):
+    pool = HttpPool(max_connections=1, http2=False)
+    for _ in range(5):
+        assert pool.client.get(stub_url).status_code == 200
+
+    stats = pool.stats
+    assert stats['requests'] == 5
+    assert stats['reused'] == 4
+    assert stats['reuse_rate'] == pytest.approx(0.8)
+    assert stats['failed'] == 0
+    assert 0.0 <= stats['mean_wait'] <= stats['max_wait']
+    pool.close()
+
+
+def test_callers_queue_for_connections_beyond_the_limit(stub_url):
+    # as batch_invoke does, more callers than connections
+    pool = HttpPool(max_connections=2, http2=False)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        statuses = list(executor.map(lambda _: pool.client.get(stub_url).status_code, range(12)))
+
+    assert statuses == [200] * 12
+    stats = pool.stats
+    assert stats['requests'] == 12
+    assert stats['failed'] == 0
+    assert stats['reused'] >= 10
+    # six callers on two connections: the last in line waits out two other requests at least
+    assert stats['max_wait'] >= 2 * StubHandler.delay
+    assert stats['max_wait'] >= stats['mean_wait'] > 0.0
+    pool.close()
+
+
+def test_failed_requests_are_counted():
+    # a port with nothing listening on it
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+
+    pool = HttpPool(max_connections=1, http2=False)
+    with pytest.raises(httpx.ConnectError):
+        pool.client.get(f'http://127.0.0.1:{port}/')
+
+    stats = pool.stats
+    assert stats['requests'] == 1
+    assert stats['failed'] == 1
+    assert stats['reused'] == 0
+    pool.close()
+
+
+def test_timeout_is_exposed_for_the_chat_model():
+    pool = HttpPool(timeout=7.0, connect_timeout=2.0)
+    assert pool.timeout == httpx.Timeout(7.0, connect=2.0)
+    assert pool.client.timeout == pool.timeout
+    pool.close()
+
+
+def test_failure_reading_the_body_is_counted(stub_url):
+    pool = HttpPool(max_connections=1, http2=False)
+    with pytest.raises(httpx.RemoteProtocolError):
+        pool.client.get(stub_url + 'truncated')
+
+    stats = pool.stats
+    assert stats['requests'] == 1
+    assert stats['failed'] == 1
+    assert stats['reused'] == 0
+    pool.close()
@@ -0,0 +1,56 @@
+# Tests for the Actor's output budget
+
+from Actor import Actor, _count_words
+
+
+def make_actor(max_tokens=None, max_words=None) -> Actor:
+    actor = Actor(first_name='Test', last_name='Actor', role='Tester')
+    actor.set_output_budget(max_tokens=max_tokens, max_words=max_words)
+    return actor
+
+
+def test_finished_reply_without_final_punctuation_is_kept():
+    actor = make_actor(max_tokens=250, max_words=100)
+    for reply in ("Good points. We should add:\n- Solar\n- GPS", "Dr. Smith agrees with Ms. Jones on this"):
+        assert actor._enforce_output_budget(reply, 'stop') == reply
+    assert actor.output_stats['overruns'] == 0
+
+
+def test_reply_cut_off_by_max_tokens_is_trimmed_to_a_sentence():
+    actor = make_actor(max_tokens=250)
+    assert actor._enforce_output_budget('First idea. Second idea is', 'length') == 'First idea.'
+    assert actor.output_stats['overruns'] == 1
+    assert actor.output_stats['trimmed_words'] == 3
+
+
+def test_reply_over_the_word_limit_is_trimmed_to_a_sentence():
+    actor = make_actor(max_words=5)
+    assert actor._enforce_output_budget('One two three. Four five six seven.', 'stop') == 'One two three.'
+    assert actor.output_stats['overruns'] == 1
+
+
+def test_untrimmed_reply_is_not_counted_as_an_overrun():
+    # without a finish reason, the punctuation fallback flags these, but trimming leaves them unchanged
+    actor = make_actor(max_tokens=250)
+    for reply in ('Great idea (see above)', '...let us move on...'):
+        assert actor._enforce_output_budget(reply) == reply
+    assert actor.output_stats == {'turns': 2, 'overruns': 0, 'overrun_rate': 0.0, 'trimmed_words': 0, 'mid_sentence_cuts': 0}
+
+
+def test_name_label_and_bracketed_emotes_are_not_counted():
+    # the reply format the stakeholder instructions ask for: a bold name label and [emotes]
+    sentence = 'We could rent the gear out for the season instead of selling it outright.'
+    reply = f'**Priya**: [shrug shoulders] {sentence} [leans forward] {sentence}'
+    actor = make_actor(max_tokens=250, max_words=28)
+
+    assert _count_words(reply) == 28
+    assert actor._enforce_output_budget(reply, 'stop') == reply
+    assert actor._enforce_output_budget('**Priya**: Agreed, let us try it. [nods]') == '**Priya**: Agreed, let us try it. [nods]'
+    assert actor.output_stats['overruns'] == 0
+
+
+def test_cut_with_no_sentence_end_in_the_budget_is_marked_and_counted():
+    actor = make_actor(max_words=3)
+    assert actor._enforce_output_budget('**Priya**: one two three four five.', 'stop') == '**Priya**: one two three...'
+    assert actor.output_stats['overruns'] == 1
+    assert actor.output_stats['mid_sentence_cuts'] == 1
@@ -0,0 +1,184 @@
+# Tests for drafting the next round's responses while the facilitator types
+
+import random
+import threading
+import time
+import zlib
+
+import pytest
+from langchain.schema import AIMessage
+
+from Actor import Actor
+from Conversation import Conversation
+
+
+class ScriptedBot:
+    """
+    Stands in for the chat model. Each reply depends on the whole prompt, so a draft made from the wrong prompt shows up
+    as a different reply. Speakers are told apart by their persona, which is their first name.
+    """
+
+    def __init__(self, replies: dict = None, failing_drafts: set = (), draft_delay: float = 0.0) -> None:
+        self.temperature: float = 0.0
+        self._replies: dict = replies or {}
+        self._failing_drafts: set = set(failing_drafts)
+        self._draft_delay: float = draft_delay
+        self.drafted: list = []
+        self.invoked: list = []
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        name = messages[1].content
+
+        # drafts run on a background thread, turns on the main one
+        if threading.current_thread() is not threading.main_thread():
+            self.drafted.append(name)
+            time.sleep(self._draft_delay)
+            if name in self._failing_drafts:
+                raise RuntimeError('draft failed')
+        else:
+            self.invoked.append(name)
+
+        if name in self._replies:
+            return AIMessage(content=self._replies[name])
+        digest = zlib.crc32('|'.join(message.content for message in messages).encode())
+        return AIMessage(content=f'**{name}**: reply {digest}.')
+
+
+def run_meeting(monkeypatch, bot, speculative, facilitator=lambda actors: ''):
+    """
+    Runs two rounds among Ann, Ben and Cat. With the shuffle disabled, the speaking order is Cat, Ben, Ann,
+    so Cat and Ben are drafted. facilitator(actors) returns the facilitator's comment.
+    """
+    monkeypatch.setattr(random, 'shuffle', lambda order: None)
+    Actor.set_convo_bot(bot)
+
+    meeting = Conversation(rounds=2, speculative=speculative, speculative_depth=2)
+    actors = [Actor(first_name=name, last_name='Test', role='Tester', persona=name) for name in ('Ann', 'Ben', 'Cat')]
+    for actor in actors:
+        meeting.add_stakeholder(actor)
+    monkeypatch.setattr('builtins.input', lambda prompt: facilitator(actors))
+
+    meeting.discuss_topic('TOPIC')
+    histories = {actor.first_name: [message.content for message in actor.export_history()] for actor in actors}
+    return meeting, histories
+
+
+def test_drafts_commit_when_the_facilitator_passes(monkeypatch):
+    _, expected = run_meeting(monkeypatch, ScriptedBot(), speculative=False)
+    bot = ScriptedBot()
+    meeting, histories = run_meeting(monkeypatch, bot, speculative=True)
+
+    assert histories == expected
+    assert meeting.speculation_stats['committed'] == 2
+    # in round 2 only Ann, who wasn't drafted, calls the model on her turn
+    assert bot.invoked == ['Cat', 'Ben', 'Ann', 'Ann']
+
+
+def test_facilitator_comment_discards_the_drafts(monkeypatch):
+    _, expected = run_meeting(monkeypatch, ScriptedBot(), speculative=False, facilitator=lambda actors: 'A comment')
+    bot = ScriptedBot()
+    meeting, histories = run_meeting(monkeypatch, bot, speculative=True, facilitator=lambda actors: 'A comment')
+
+    assert histories == expected
+    assert meeting.speculation_stats['committed'] == 0
+    assert bot.invoked == ['Cat', 'Ben', 'Ann'] * 2
+
+
+def test_failed_draft_cancels_the_later_drafts(monkeypatch):
+    _, expected = run_meeting(monkeypatch, ScriptedBot(), speculative=False)
+    bot = ScriptedBot(failing_drafts={'Cat'})
+    meeting, histories = run_meeting(monkeypatch, bot, speculative=True)
+
+    assert histories == expected
+    assert meeting.speculation_stats['committed'] == 0
+    # Ben's draft assumed Cat's, so it is never generated
+    assert bot.drafted == ['Cat']
+    assert bot.invoked == ['Cat', 'Ben', 'Ann'] * 2
+
+
+def test_stale_draft_cancels_the_later_drafts(monkeypatch):
+    def aside(actors):
+        # Cat hears something the drafts didn't, after they were made
+        time.sleep(0.05)
+        actors[2].hear('An aside.')
+        return ''
+
+    _, expected = run_meeting(monkeypatch, ScriptedBot(), speculative=False, facilitator=aside)
+    bot = ScriptedBot()
+    meeting, histories = run_meeting(monkeypatch, bot, speculative=True, facilitator=aside)
+
+    assert histories == expected
+    assert meeting.speculation_stats['committed'] == 0
+    assert bot.invoked == ['Cat', 'Ben', 'Ann'] * 2
+
+
+@pytest.mark.parametrize('reply', ['*Pass*', '**Cat**: *Done*'])
+def test_passing_or_done_speaker_is_not_heard_by_later_drafts(monkeypatch, reply):
+    _, expected = run_meeting(monkeypatch, ScriptedBot(replies={'Cat': reply}), speculative=False)
+    bot = ScriptedBot(replies={'Cat': reply})
+    meeting, histories = run_meeting(monkeypatch, bot, speculative=True)
+
+    assert histories == expected
+    assert reply not in histories['Ben']
+    assert meeting.speculation_stats['committed'] == 2
+
+
+def test_speculation_stats(monkeypatch):
+    def typing(actors):
+        time.sleep(0.3)
+        return ''
+
+    meeting, _ = run_meeting(monkeypatch, ScriptedBot(draft_delay=0.05), speculative=True, facilitator=typing)
+    stats = meeting.speculation_stats
+    assert stats['speculated'] == 2
+    assert stats['committed'] == 2
+    assert stats['hit_rate'] == 1.0
+    # both drafts were ready before their turns, so all of their model time was saved
+    assert 0.09 <= stats['saved'] <= 0.3
+
+    meeting, _ = run_meeting(monkeypatch, ScriptedBot(), speculative=True, facilitator=lambda actors: 'A comment')
+    assert meeting.speculation_stats['hit_rate'] == 0.0
+
+
+class TestCommitDraftStaleness:
+    """
+    commit_draft() relies on the history only growing between a snapshot and the commit: a draft commits exactly when the
+    history now ends in the prompt's last message at the prompt's length, i.e. the Actor heard just what the draft assumed.
+    """
+
+    @pytest.fixture
+    def actor(self):
+        Actor.set_convo_bot(ScriptedBot())
+        actor = Actor(first_name='Ann', last_name='Test', role='Tester', persona='Ann')
+        actor.create_system_message()
+        actor.hear('Opening remarks.')
+        return actor
+
+    def test_draft_leaves_the_actor_unchanged(self, actor):
+        snapshot = actor.snapshot_prompt()
+        tokens = actor.token_count
+        actor.draft(snapshot, ['Expected remark.'])
+        assert actor.snapshot_prompt() == snapshot
+        assert actor.token_count == tokens
+
+    def test_draft_commits_when_the_actor_heard_what_it_assumed(self, actor):
+        draft = actor.draft(actor.snapshot_prompt(), ['First remark.', 'Second remark.'])
+        actor.hear('First remark.')
+        actor.hear('Second remark.')
+        assert actor.commit_draft(draft) == draft['text']
+
+    def test_draft_commits_when_nothing_was_assumed_or_heard(self, actor):
+        draft = actor.draft(actor.snapshot_prompt(), [])
+        assert actor.commit_draft(draft) == draft['text']
+
+    @pytest.mark.parametrize('heard', [[], ['Other remark.'], ['Expected remark.', 'Extra remark.']])
+    def test_draft_is_stale_when_the_actor_heard_something_else(self, actor, heard):
+        draft = actor.draft(actor.snapshot_prompt(), ['Expected remark.'])
+        for message in heard:
+            actor.hear(message)
+        assert actor.commit_draft(draft) is None
+
+    def test_draft_is_stale_once_the_actor_has_spoken(self, actor):
+        draft = actor.draft(actor.snapshot_prompt(), [])
+        actor.invoke()
+        assert actor.commit_draft(draft) is None
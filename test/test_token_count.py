@@ -0,0 +1,87 @@
+# Tests for the Actor's running token counts
+
+import pytest
+
+import token_counter
+from Actor import Actor
+from token_counter import count_message_tokens, count_tokens, set_tokenizer
+from tracer import tracer
+
+
+@pytest.fixture
+def word_tokenizer():
+    # one token per word keeps the expected counts readable
+    previous = token_counter._tokenizer
+    set_tokenizer(lambda text: len(text.split()))
+    yield
+    set_tokenizer(previous)
+
+
+def make_actor() -> Actor:
+    actor = Actor(first_name='Test', last_name='Actor', role='Tester')
+    actor.behavior = 'behavior'
+    actor.company = 'company'
+    actor.create_system_message()
+    return actor
+
+
+def test_pending_messages_are_counted_as_they_are_heard(word_tokenizer):
+    actor = make_actor()
+    history_tokens = actor.token_count
+
+    actor.hear('one two three')
+    actor.hear('four five')
+    assert actor.pending_token_count == 5
+    assert actor.token_count == history_tokens
+
+    actor.export_history()
+    assert actor.pending_token_count == 0
+    assert actor.token_count > history_tokens + 5
+
+
+def test_hearing_does_not_tokenize_and_a_broadcast_is_encoded_once():
+    encoded = []
+    previous = token_counter._tokenizer
+    set_tokenizer(lambda text: encoded.append(text) or len(text.split()))
+    try:
+        listeners = [make_actor() for _ in range(3)]
+        encoded.clear()
+
+        for actor in listeners:
+            actor.hear('the same broadcast')
+        assert encoded == []
+
+        for actor in listeners:
+            assert actor.pending_token_count == 3
+            actor.export_history()
+        # one encode for every listener, and none for the coalesced message
+        assert encoded.count('the same broadcast') == 1
+    finally:
+        set_tokenizer(previous)
+
+
+def test_token_count_matches_a_full_recount(word_tokenizer):
+    actor = make_actor()
+    for turn in range(5):
+        actor.hear(f'heard message {turn}')
+    history = actor.export_history()
+
+    assert actor.token_count == sum(count_message_tokens(message) for message in history)
+    assert actor.message_tokens == [count_tokens(message.content) + token_counter.MESSAGE_OVERHEAD for message in history]
+
+
+def test_counting_is_traced_apart_from_formatting():
+    actor = make_actor()
+    tracer.clear()
+    tracer.enable()
+    try:
+        actor.hear('a message')
+        actor.export_history()
+    finally:
+        tracer.disable()
+
+    paths = [path for _, path, _, _, _, _, _ in tracer._events]
+    tracer.clear()
+    assert 'prompt.format' in paths
+    assert 'tokens.count' in paths
+    assert not any(path.startswith('prompt.format;') for path in paths)